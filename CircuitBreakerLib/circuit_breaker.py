@@ -1,20 +1,65 @@
+import asyncio
+import errno
+import selectors
 import socket
+import sys
 import time
 import threading
 import os
+import queue
+import weakref
 import yaml
 import logging
 from enum import Enum
-from collections import deque
-from typing import Callable, Optional, Any, Dict
+from array import array
+from typing import Callable, Optional, Any, Dict, Iterable, Protocol
 import concurrent.futures
 
+# libyaml-backed loader when PyYAML was built with it
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeLoader
+
+# Optional: push-based config reload (pip install watchdog)
+try:
+    from watchdog.observers import Observer
+    from watchdog.events import PatternMatchingEventHandler
+except ImportError:
+    Observer = None
+
+# watchdog event types that mean the config file content may have changed
+_CONFIG_WRITE_EVENTS = frozenset(("created", "modified", "moved", "deleted", "closed"))
+
+# Optional: state shared between workers (pip install redis)
+try:
+    import redis
+except ImportError:
+    redis = None
+
+# Failure window storage: a ring of the last failure_threshold timestamps is
+# smallest for the usual small thresholds; above this threshold fixed 1 s
+# buckets take less memory
+BUCKETS_MIN_THRESHOLD = 200
+
+# Empty ring slot, older than any cutoff
+_NEVER = -(1 << 63)
+
 # Circuit state
 class State(Enum):
     CLOSED = "closed"
     OPEN = "open"
     HALF_OPEN = "half_open"
 
+# Internal state codes: plain int compares on the hot path instead of Enum
+# equality. State stays the public type for callbacks and status().
+_CLOSED, _OPEN, _HALF_OPEN = 0, 1, 2
+_STATES = (State.CLOSED, State.OPEN, State.HALF_OPEN)
+
+# Timestamps are time.monotonic_ns() ints: integer compares on the hot path
+# and immune to wall-clock jumps
+_NS_PER_S = 1_000_000_000
+
 class CircuitOpenError(Exception):
     pass
 
@@ -22,223 +67,1043 @@ class ResponseTimeoutError(Exception):
     """Raised when the API call exceeds the configured response timeout."""
     pass
 
+# Per-API circuit state. Slots keep each circuit small and make the hot
+# path's attribute reads direct slot loads instead of dict lookups.
+class _CircuitState:
+    __slots__ = ("state", "fail_ring", "fail_head", "buckets", "bucket_sum",
+                 "bucket_head", "half_open_inflight", "half_open_successes", "opened_at",
+                 "blocked_until", "open_msg", "lock")
+
+    def __init__(self):
+        self.state = _CLOSED
+        self.fail_ring = None       # last failure_threshold failure timestamps
+        self.fail_head = 0          # next slot to overwrite, i.e. the oldest
+        self.buckets = None         # failures per 1 s slot (large thresholds only)
+        self.bucket_sum = 0
+        self.bucket_head = 0
+        self.half_open_inflight = 0
+        self.half_open_successes = 0    # successes since the circuit last opened
+        self.opened_at = None
+        self.blocked_until = 0      # OPEN rejects calls while now < blocked_until
+        self.open_msg = None        # CircuitOpenError message for OPEN rejections
+        # Guards multi-field updates only; nothing takes one lock while holding
+        # another or calls back out under it, so it need not be reentrant
+        self.lock = threading.Lock()
+
+# Inline on_state_change events raised under a circuit lock, parked per
+# thread until that thread has released the lock
+class _PendingEvents(threading.local):
+    def __init__(self):
+        self.events = []
+
+# Shared circuit state
+# Lets workers of one deployment see each other's trips. A store holds, per
+# circuit name, the wall-clock time its circuit is open until (0.0 if none).
+# clear() removes a trip only while it is still the one the caller recorded,
+# so a worker that recovers never erases a newer trip from another worker.
+class StateStore(Protocol):
+    def get(self, key: str) -> float: ...
+    def get_many(self, keys: list) -> list: ...
+    def record(self, key: str, open_until: float) -> None: ...
+    def clear(self, key: str, open_until: float) -> None: ...
+
+class InMemoryStateStore:
+    """Process-local store; shares trips between breakers in one process."""
+
+    def __init__(self):
+        self._open_until: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> float:
+        return self._open_until.get(key, 0.0)
+
+    def get_many(self, keys: list) -> list:
+        get = self._open_until.get
+        return [get(key, 0.0) for key in keys]
+
+    def record(self, key: str, open_until: float) -> None:
+        self._open_until[key] = open_until
+
+    def clear(self, key: str, open_until: float) -> None:
+        with self._lock:
+            if self._open_until.get(key) == open_until:
+                del self._open_until[key]
+
+# Compare-and-delete in one server-side step
+_REDIS_CLEAR = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+class RedisStateStore:
+    """Redis-backed store; each trip is one SET that expires with the trip."""
+
+    def __init__(self, url: str = "redis://localhost:6379/0", prefix: str = "circuit_breaker:",
+                 client: Any = None):
+        if client is None:
+            if redis is None:
+                raise ImportError("RedisStateStore requires redis (pip install redis)")
+            client = redis.Redis.from_url(url, socket_timeout=0.1, socket_connect_timeout=0.1)
+        self._client = client
+        self._prefix = prefix
+        self._clear = client.register_script(_REDIS_CLEAR)
+
+    def get(self, key: str) -> float:
+        value = self._client.get(self._prefix + key)
+        return float(value) if value else 0.0
+
+    # One MGET round trip for all keys
+    def get_many(self, keys: list) -> list:
+        values = self._client.mget([self._prefix + key for key in keys])
+        return [float(value) if value else 0.0 for value in values]
+
+    def record(self, key: str, open_until: float) -> None:
+        ttl_ms = int((open_until - time.time()) * 1000)
+        if ttl_ms > 0:
+            self._client.set(self._prefix + key, repr(open_until), px=ttl_ms)
+
+    def clear(self, key: str, open_until: float) -> None:
+        self._clear(keys=[self._prefix + key], args=[repr(open_until)])
+
+# Body of every background thread: call step(breaker) until stopped, waiting
+# the seconds it returns in between. The breaker is held only weakly across
+# waits, so a running thread never keeps an unused breaker alive.
+def _run_weakly(ref: weakref.ref, step: Callable, stop: threading.Event, wait: float):
+    while not stop.wait(wait):
+        breaker = ref()
+        if breaker is None:
+            return
+        wait = step(breaker)
+        breaker = None
+
 # Circuit Breake
+# on_state_change(name, old, new, ctx) runs synchronously on every
+# transition, in the thread that caused it, as soon as that thread has
+# released the circuit lock. With async_events=True it runs later on a
+# background thread instead, so a slow handler never delays a guarded call;
+# events then arrive in order but after the transition, and are dropped
+# with a warning while 10k are already queued.
 class CircuitBreaker:
     def __init__(
         self,
         on_state_change: Optional[Callable[[str, State, State, dict], None]] = None,
         config_file: str = "CircuitBreaker.yaml",
+        state_store: Optional[StateStore] = None,
+        async_events: bool = False,
     ):
-        self._circuits: Dict[str, dict] = {}       # API-level states
-        self._locks: Dict[str, threading.RLock] = {}
+        self._circuits: Dict[tuple, _CircuitState] = {}     # (project, service, api) -> API-level state
+        self._service_index: Dict[tuple, set] = {}  # (project, service) -> circuit keys
+        self._last_down: Dict[tuple, int] = {}      # (project, service) -> port down ts
+        self._last_up: Dict[tuple, int] = {}        # (project, service) -> port up ts
+        self._is_docker_cached = os.path.exists("/.dockerenv") or os.path.exists("/proc/self/cgroup")
+        self._port_targets: Dict[tuple, tuple] = {}  # (project, service) -> (host, port, interval)
+        self._port_lock = threading.Lock()
+        self._stop = threading.Event()   # set by close(); stops the background threads
+        self._threads: list = []         # background threads started so far
+        self._port_watcher: Optional[threading.Thread] = None
         self._on_state_change = on_state_change
+        self._async_events = async_events
+        self._pending = _PendingEvents()
+        # Store writes, and on_state_change with async_events, run on a
+        # publisher thread, off the caller's path
+        self._events: queue.Queue = queue.Queue(maxsize=10_000)
+        self._events_lock = threading.Lock()
+        self._event_publisher: Optional[threading.Thread] = None
+        self._state_store = state_store
+        self._store_cache: Dict[tuple, tuple] = {}   # circuit key -> (open_until, expires ns)
+        self._store_written: Dict[tuple, float] = {}  # circuit key -> open_until we recorded
+        self._store_ttl_ns = _NS_PER_S
+        self._store_ok = True
+        self._store_syncer: Optional[threading.Thread] = None
         self.config_file = os.path.join(os.getenv("SERVICE_PATH", "."), config_file)
-        self._cfg_cache = {}
         self._cfg_mtime = None
+        # (raw config, {(project, service): resolved cfg}) swapped as one tuple
+        # on reload, so a reader never pairs the new file with old cfgs
+        self._cfg_snapshot: tuple = ({}, {})
+        self._cfg_last_check = 0
+        self._cfg_epoch = [0]   # bumped after every reload; wrappers compare it per call
+        self._cfg_ticker: Optional[threading.Thread] = None
+        self._cfg_ttl_ns = _NS_PER_S // 2   # between config file stat checks
+        self._cfg_lock = threading.Lock()
+        self._cfg_dirty = True
+        self._cfg_dirty_at = 0.0
+        self._cfg_debounce = 0.5   # seconds to let an editor finish writing
         self._log = logging.getLogger("CircuitBreaker")
+        # Started with the ticker at first decoration; until then, and
+        # without watchdog, config changes are found by polling the mtime
+        self._cfg_observer = None
+        # Shared pool for response_timeout calls; workers are reused across calls
+        self._timeout_executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=(os.cpu_count() or 1) * 4, thread_name_prefix="cb-timeout"
+        )
+        # Runs on close(), when the breaker is collected, or at interpreter
+        # exit. weakref.finalize keeps one atexit hook for all breakers and
+        # holds none of them alive
+        self._finalizer = weakref.finalize(self, self._shutdown, self._stop, self._events,
+                                           self._threads, self._timeout_executor)
+
+    # Stop the background threads (config ticker and watcher, port watcher,
+    # event publisher) and the response_timeout pool, after delivering the
+    # events still queued. Guarded functions should not be called afterwards:
+    # nothing reloads config or probes ports, and response_timeout calls fail.
+    def close(self):
+        self._finalizer()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    # Finalizer body; it must not reference the breaker itself
+    @staticmethod
+    def _shutdown(stop: threading.Event, events: queue.Queue, threads: list,
+                  executor: concurrent.futures.Executor, timeout: float = 1.0):
+        stop.set()
+        try:
+            events.put(None, timeout=timeout)   # publisher drains the queue, then exits
+        except queue.Full:
+            pass
+        for thread in threads:
+            if hasattr(thread, "stop"):   # watchdog Observer
+                thread.stop()
+        current = threading.current_thread()
+        for thread in threads:
+            if thread is not current:
+                thread.join(timeout)
+        executor.shutdown(wait=False)
+
+    # Start a daemon thread running step(breaker) via _run_weakly
+    def _start_thread(self, name: str, step: Callable, wait: float) -> threading.Thread:
+        thread = threading.Thread(target=_run_weakly, name=name, daemon=True,
+                                  args=(weakref.ref(self), step, self._stop, wait))
+        thread.start()
+        self._threads.append(thread)
+        return thread
+
+    # Config file watcher (falls back to mtime polling without watchdog)
+    def _start_config_watcher(self):
+        if Observer is None:
+            return None
+
+        ref = weakref.ref(self)   # the observer thread must not keep us alive
+
+        class _ConfigHandler(PatternMatchingEventHandler):
+            def on_any_event(self, event):
+                # Only writes count: our own reads of the file raise opened /
+                # closed_no_write events and would otherwise reload in a loop
+                breaker = ref()
+                if breaker is None or event.event_type not in _CONFIG_WRITE_EVENTS:
+                    return
+                breaker._cfg_dirty_at = time.monotonic()
+                breaker._cfg_dirty = True
 
-    # Load config
-    def _load_config(self, project: str, service: str):
         try:
-            mtime = os.path.getmtime(self.config_file)
-            if self._cfg_mtime != mtime:
-                with open(self.config_file, "r") as f:
-                    full_config = yaml.safe_load(f) or {}
-                self._cfg_cache = full_config
-                self._cfg_mtime = mtime
+            observer = Observer()
+            observer.daemon = True
+            observer.schedule(
+                _ConfigHandler(patterns=[os.path.basename(self.config_file)]),
+                os.path.dirname(self.config_file) or ".",
+            )
+            observer.start()
+        except Exception as e:
+            self._log.warning("Config watcher unavailable, polling mtime instead: %s", e)
+            return None
+        self._threads.append(observer)
+        return observer
+
+    # Caller holds _cfg_lock. The new snapshot is complete before it is
+    # published, and the epoch moves only after that
+    def _read_config(self):
+        try:
+            with open(self.config_file, "r") as f:
+                cache = yaml.load(f, Loader=SafeLoader) or {}
         except FileNotFoundError:
-            self._cfg_cache = {}
+            cache = {}
+
+        # Re-resolve the services the port watcher follows, so it keeps
+        # watching (with the new host/port) without waiting for their next call
+        resolved = {}
+        with self._port_lock:
+            targets = {}
+            for project, service in self._port_targets:
+                cfg = resolved[(project, service)] = self._resolve_config(project, service, cache)
+                if cfg["port_check"]:
+                    targets[(project, service)] = self._port_target(cfg["port_check"])
+            self._port_targets = targets
+
+        self._cfg_snapshot = (cache, resolved)
+        self._cfg_epoch[0] += 1
+
+    # Reload the config file if it changed: on watchdog events (debounced) or,
+    # without watchdog, when its mtime moved at most once per _cfg_ttl_ns
+    def _refresh_config(self, now: Optional[int] = None):
+        if self._cfg_observer is not None:
+            if self._cfg_dirty and time.monotonic() - self._cfg_dirty_at >= self._cfg_debounce:
+                with self._cfg_lock:
+                    if self._cfg_dirty:
+                        self._cfg_dirty = False
+                        self._read_config()
+        else:
+            if now is None:
+                now = time.monotonic_ns()
+            if now - self._cfg_last_check >= self._cfg_ttl_ns:
+                with self._cfg_lock:
+                    if now - self._cfg_last_check < self._cfg_ttl_ns:
+                        return
+                    self._cfg_last_check = now
+                    try:
+                        mtime = os.path.getmtime(self.config_file)
+                        if self._cfg_mtime != mtime:
+                            self._read_config()
+                            self._cfg_mtime = mtime
+                    except FileNotFoundError:
+                        if self._cfg_mtime is not None:
+                            self._cfg_mtime = None
+                            self._read_config()
+
+    # Background config ticker: keeps the config fresh every _cfg_ttl_ns, so
+    # guarded calls never read the clock or stat the file themselves; they
+    # only compare _cfg_epoch. Shared trips sync on a thread of their own, so
+    # a slow store never delays a reload
+    def _start_config_ticker(self):
+        with self._cfg_lock:
+            if self._cfg_ticker is None and not self._stop.is_set():
+                self._cfg_observer = self._start_config_watcher()
+                interval = self._cfg_ttl_ns / _NS_PER_S
+                self._cfg_ticker = self._start_thread("cb-config", CircuitBreaker._config_tick,
+                                                      interval)
+                if self._state_store is not None:
+                    self._store_syncer = self._start_thread(
+                        "cb-store-sync", CircuitBreaker._store_tick, self._store_ttl_ns / _NS_PER_S
+                    )
+
+    def _config_tick(self) -> float:
+        try:
+            self._refresh_config(time.monotonic_ns())
+        except Exception as e:
+            self._log.warning("Config refresh failed: %s", e)
+        return self._cfg_ttl_ns / _NS_PER_S
+
+    def _store_tick(self) -> float:
+        try:
+            self._sync_shared(time.monotonic_ns())
+        except Exception as e:
+            self._log.warning("State store sync failed: %s", e)
+        return self._store_ttl_ns / _NS_PER_S
+
+    # Load config
+    def _load_config(self, project: str, service: str, now: Optional[int] = None):
+        self._refresh_config(now)
 
-        cb_config = self._cfg_cache.get(project, {}).get(service, {})
+        # Resolved once per reload; callers must treat the dict as read-only.
+        # Raw config and resolved map come from the same snapshot: a cfg built
+        # while a reload lands goes into the old map and is dropped with it
+        cache, resolved = self._cfg_snapshot
+        cfg = resolved.get((project, service))
+        if cfg is not None:
+            return cfg
 
-        return {
+        cfg = self._resolve_config(project, service, cache)
+        if cfg["port_check"]:
+            self._watch_port(cfg["port_check"])
+        resolved[(project, service)] = cfg
+        return cfg
+
+    # Build the cfg for one service from the raw config; no side effects
+    def _resolve_config(self, project: str, service: str, cache: dict) -> dict:
+        cb_config = cache.get(project, {}).get(service, {})
+        cfg = {
             "failure_threshold": cb_config.get("failure_threshold", 5),
             "recovery_timeout": cb_config.get("recovery_timeout", 30),
             "half_open_max_calls": cb_config.get("half_open_max_calls", 1),
+            "success_threshold": cb_config.get("success_threshold", 1),
             "window_seconds": cb_config.get("window_seconds", 60),
             "response_timeout": cb_config.get("response_timeout", None),
             "service_port": cb_config.get("service_port", None),
             "local_host": cb_config.get("local_host", "localhost"),
             "docker_host": cb_config.get("docker_host", "host.docker.internal"),
             "active": cb_config.get("active", True),
+            "port_check": None,
         }
+        cfg["recovery_timeout_ns"] = int(cfg["recovery_timeout"] * _NS_PER_S)
+        cfg["window_ns"] = int(cfg["window_seconds"] * _NS_PER_S)
+        # Everything the port check needs, derived once per reload
+        if cfg["active"] and cfg["service_port"]:
+            cfg["port_check"] = {
+                "service_prefix": self._service_prefix(project, service),
+                "port": cfg["service_port"],
+                "host": cfg["docker_host"] if self._is_docker_cached else cfg["local_host"],
+                "recovery_timeout": cfg["recovery_timeout"],
+                "recovery_timeout_ns": cfg["recovery_timeout_ns"],
+            }
+        return cfg
 
     # Circuit keys & states
+    # Flat registry keys. Interned parts let dict lookups match on identity
+    # before falling back to string comparison.
     def _circuit_key(self, project: str, service: str, api: str):
-        return f"{project}:{service}:{api}"
+        return (sys.intern(project), sys.intern(service), sys.intern(api))
 
     def _service_prefix(self, project: str, service: str):
-        return f"{project}:{service}:"
+        return (sys.intern(project), sys.intern(service))
 
-    def _get_state(self, key: str):
+    @staticmethod
+    def _key_name(key: tuple) -> str:
+        return ":".join(key)
+
+    def _get_state(self, key: tuple) -> _CircuitState:
         if key not in self._circuits:
-            self._circuits[key] = {
-                "state": State.CLOSED,
-                "fail_times": deque(),
-                "half_open_inflight": 0,
-                "opened_at": None,
-            }
+            self._service_index.setdefault(key[:2], set()).add(key)
+            self._circuits[key] = _CircuitState()
         return self._circuits[key]
 
-    def _set_state(self, key: str, new_state: State, ctx: dict):
-        state = self._get_state(key)
-        old = state["state"]
+    # now is time.monotonic_ns(); ctx["ts"] handed to on_state_change stays wall-clock
+    # Opening takes the circuit's recovery_timeout in ns and fixes the deadline
+    def _set_state(self, key: tuple, state: _CircuitState, new_state: int, ctx: dict, now: int,
+                   recovery_ns: int = 0):
+        old = state.state
         if old != new_state:
-            state["state"] = new_state
-            if new_state == State.OPEN:
-                state["opened_at"] = ctx.get("ts", time.time())
-            if old == State.HALF_OPEN and new_state == State.CLOSED:
-                state["half_open_inflight"] = 0
-                state["fail_times"].clear()
+            # Deadline first: lock-free readers that see OPEN must see it
+            if new_state == _OPEN:
+                state.opened_at = now
+                state.blocked_until = now + recovery_ns
+                state.half_open_successes = 0
+                # Formatted on the first trip and kept: lock-free readers may
+                # still use it after the circuit has closed again
+                if state.open_msg is None:
+                    state.open_msg = f"Circuit '{self._key_name(key)}' is OPEN. Retry later."
+            elif new_state == _HALF_OPEN:
+                # fresh probe slots before lock-free readers can see HALF_OPEN
+                state.half_open_inflight = 0
+            state.state = new_state
+            if old == _HALF_OPEN and new_state == _CLOSED:
+                state.half_open_inflight = 0
+                state.fail_ring = None
+                state.fail_head = 0
+                state.buckets = None
+                state.bucket_sum = 0
+            if self._state_store is not None:
+                if new_state == _OPEN and ctx.get("reason") != "shared_state":
+                    open_until = time.time() + recovery_ns / _NS_PER_S
+                    self._store_cache[key] = (open_until, now + self._store_ttl_ns)
+                    self._store_written[key] = open_until
+                    self._publish((self._state_store.record, (self._key_name(key), open_until)))
+                elif new_state == _CLOSED:
+                    # Recovered: clear our own trip, or the next sync would reopen
+                    # us from it; a newer one from another worker stays. Cached as
+                    # 0.0 rather than dropped so a read racing the queued clear
+                    # can't fetch our old value back
+                    self._store_cache[key] = (0.0, now + self._store_ttl_ns)
+                    written = self._store_written.pop(key, None)
+                    if written is not None:
+                        self._publish((self._state_store.clear, (self._key_name(key), written)))
             if self._on_state_change:
-                self._on_state_change(key, old, new_state, ctx)
+                ctx.setdefault("ts", time.time())
+                event = (self._on_state_change,
+                         (self._key_name(key), _STATES[old], _STATES[new_state], ctx))
+                if self._async_events:
+                    self._publish(event)
+                else:
+                    # Delivered by _flush_events once our caller drops the lock
+                    self._pending.events.append(event)
 
-    # Prune old failures
-    def _prune_failures(self, key: str, cfg: dict):
-        now = time.time()
-        state = self._get_state(key)
-        while state["fail_times"] and state["fail_times"][0] < now - cfg["window_seconds"]:
-            state["fail_times"].popleft()
+    # Adopt trips other workers recorded in the state store. Every circuit
+    # whose cached value is older than _store_ttl_ns is fetched in one
+    # get_many round trip, so each process sends the store about one
+    # MGET per second however many circuits it has.
+    def _sync_shared(self, now: int):
+        circuits = tuple(self._circuits.items())
+        cache = self._store_cache
+        stale = [key for key, _ in circuits if key not in cache or now >= cache[key][1]]
+        if stale:
+            try:
+                values = self._state_store.get_many([self._key_name(key) for key in stale])
+                self._store_ok = True
+            except Exception as e:
+                # Store unreachable: keep running on local state alone
+                if self._store_ok:
+                    self._log.warning("State store unavailable, using local state: %s", e)
+                    self._store_ok = False
+                values = [0.0] * len(stale)
+            now = time.monotonic_ns()   # the round trip took time
+            expires = now + self._store_ttl_ns
+            for key, open_until in zip(stale, values):
+                cache[key] = (open_until, expires)
 
-    def _is_docker(self):
-        return os.path.exists("/.dockerenv") or os.path.exists("/proc/self/cgroup")
-        
-    # Service-level port check with recovery timeout
-    def _check_service_port(self, project: str, service: str, cfg: dict):
-        port = cfg.get("service_port")
-        if not port:
+        wall = time.time()
+        for key, state in circuits:
+            remaining = cache[key][0] - wall
+            if remaining > 0 and state.state == _CLOSED:
+                with state.lock:
+                    if state.state == _CLOSED:
+                        self._set_state(key, state, _OPEN, {"reason": "shared_state"}, now,
+                                        int(remaining * _NS_PER_S))
+        self._flush_events()
+
+    # Work queued by transitions (store writes; on_state_change calls with
+    # async_events), run in order by one daemon thread, so slow
+    # log/telemetry/store I/O never holds a circuit lock or delays a guarded
+    # call. After close() no publisher is left, so tasks run inline
+    def _publish(self, task: tuple):
+        if self._event_publisher is None:
+            with self._events_lock:
+                if self._event_publisher is None and not self._stop.is_set():
+                    # Only the queue and logger: the publisher holds no breaker
+                    self._event_publisher = threading.Thread(
+                        target=self._publish_loop, args=(self._events, self._log),
+                        name="cb-events", daemon=True
+                    )
+                    self._event_publisher.start()
+                    self._threads.append(self._event_publisher)
+        if self._stop.is_set():
+            self._deliver(task, self._log)
+            return
+        try:
+            self._events.put_nowait(task)
+        except queue.Full:
+            self._log.warning("Dropped state change event for '%s': queue full", task[1][0])
+
+    # Deliver this thread's inline events; every path that may transition a
+    # circuit calls it right after releasing the circuit lock
+    def _flush_events(self):
+        events = self._pending.events
+        while events:
+            self._deliver(events.pop(0), self._log)
+
+    @staticmethod
+    def _publish_loop(events: queue.Queue, log: logging.Logger):
+        while True:
+            task = events.get()
+            if task is None:
+                return
+            CircuitBreaker._deliver(task, log)
+
+    @staticmethod
+    def _deliver(task: tuple, log: logging.Logger):
+        fn, args = task
+        try:
+            fn(*args)
+        except Exception as e:
+            log.warning("State change handler failed for '%s': %s", args[0], e)
+
+    # Small thresholds: overwrite the oldest slot of a fixed ring. The window
+    # holds failure_threshold failures exactly when the oldest of the last
+    # failure_threshold timestamps is still inside it, so nothing is counted
+    def _ring_failure(self, state: _CircuitState, cfg: dict, now: int) -> bool:
+        size = cfg["failure_threshold"]
+        if size < 1:
             return True
+        ring = state.fail_ring
+        if ring is None or len(ring) != size:
+            ring = state.fail_ring = array("q", [_NEVER]) * size
+            state.fail_head = 0
+
+        head = state.fail_head
+        ring[head] = now
+        head = (head + 1) % size
+        state.fail_head = head
+        return ring[head] >= now - cfg["window_ns"]
+
+    # Large thresholds: expire the 1 s buckets that slid out of the window
+    # and subtract their counts from the running sum
+    def _prune_buckets(self, state: _CircuitState, cfg: dict, now: int):
+        tick = now // _NS_PER_S
+        window = max(1, int(cfg["window_seconds"]))
+        buckets = state.buckets
+
+        if buckets is None or len(buckets) != window:
+            state.buckets = array("i", [0]) * window
+            state.bucket_sum = 0
+            state.bucket_head = tick
+            return
+
+        advance = tick - state.bucket_head
+        if advance <= 0:
+            return
+        if advance >= window:
+            state.buckets = array("i", [0]) * window
+            state.bucket_sum = 0
+        else:
+            for t in range(state.bucket_head + 1, tick + 1):
+                i = t % window
+                state.bucket_sum -= buckets[i]
+                buckets[i] = 0
+        state.bucket_head = tick
+
+    def _is_docker(self):
+        return self._is_docker_cached
 
-        service_prefix = self._service_prefix(project, service)
-        now = time.time()
+    # Background port watcher: one thread probes every configured service port
+    # concurrently and keeps _last_up/_last_down fresh, so guarded calls only
+    # fall back to a blocking connect when no recent result exists
+    def _watch_port(self, port_check: dict):
+        with self._port_lock:
+            self._port_targets[port_check["service_prefix"]] = self._port_target(port_check)
+            if self._port_watcher is None and not self._stop.is_set():
+                self._port_watcher = self._start_thread("cb-port-watcher",
+                                                        CircuitBreaker._port_watch_tick, 0)
+
+    @staticmethod
+    def _port_target(port_check: dict) -> tuple:
+        return (port_check["host"], port_check["port"], port_check["recovery_timeout"])
+
+    # One probe round; returns the seconds until the next
+    def _port_watch_tick(self) -> float:
+        targets = dict(self._port_targets)
+        if not targets:
+            return 1.0
+        # Refresh well inside the recovery_timeout / 2 freshness window
+        interval = max(1.0, min(t[2] for t in targets.values()) / 4)
+        try:
+            results = self._probe_ports(targets)
+        except Exception as e:
+            self._log.warning("Port watcher probe failed: %s", e)
+            results = {}
+        now = time.monotonic_ns()
+        for service_prefix, up in results.items():
+            _, port, recovery_timeout = targets[service_prefix]
+            recovery_ns = int(recovery_timeout * _NS_PER_S)
+            if up:
+                self._last_up[service_prefix] = now
+            elif now - self._last_down.get(service_prefix, now - recovery_ns) >= recovery_ns:
+                self._last_up.pop(service_prefix, None)
+                self._mark_service_down(service_prefix, port, recovery_ns, now)
+        return interval
+
+    @staticmethod
+    def _probe_ports(targets: Dict[tuple, tuple], timeout: float = 1.0) -> Dict[tuple, bool]:
+        results = {}
+        sel = selectors.DefaultSelector()
+        try:
+            for service_prefix, (host, port, _) in targets.items():
+                sock = None
+                try:
+                    family, type_, proto, _, addr = socket.getaddrinfo(
+                        host, port, type=socket.SOCK_STREAM
+                    )[0]
+                    sock = socket.socket(family, type_, proto)
+                    sock.setblocking(False)
+                    err = sock.connect_ex(addr)
+                except OSError:
+                    err = -1
+                if err == 0 or err not in (errno.EINPROGRESS, errno.EWOULDBLOCK, errno.EAGAIN):
+                    results[service_prefix] = err == 0
+                    if sock is not None:
+                        sock.close()
+                    continue
+                sel.register(sock, selectors.EVENT_WRITE, service_prefix)
+
+            deadline = time.monotonic() + timeout
+            while sel.get_map():
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                for key, _ in sel.select(remaining):
+                    sock = key.fileobj
+                    results[key.data] = sock.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR) == 0
+                    sel.unregister(sock)
+                    sock.close()
+
+            # Still pending after the timeout: treat as down
+            for key in list(sel.get_map().values()):
+                results[key.data] = False
+                sel.unregister(key.fileobj)
+                key.fileobj.close()
+        finally:
+            sel.close()
+        return results
+
+    # Open every circuit of a service whose port is unreachable
+    # Callers (the port watcher, _enter before it locks) hold no circuit lock,
+    # so each circuit is opened under its own lock
+    def _mark_service_down(self, service_prefix: tuple, port: int, recovery_ns: int, now: int):
+        service_keys = tuple(self._service_index.get(service_prefix, ()))
+
+        # Create dummy if none exist
+        if not service_keys:
+            service_keys = (service_prefix + ("_dummy_api",),)
+
+        for circuit_key in service_keys:
+            state = self._get_state(circuit_key)
+            with state.lock:
+                self._set_state(circuit_key, state, _OPEN,
+                                {"reason": f"port_{port}_down"}, now, recovery_ns)
+        self._flush_events()
+
+        # Record down timestamp for recovery_timeout logic
+        self._last_down[service_prefix] = now
+
+    # Service-level port check with recovery timeout
+    # port_check is the per-service dict built by _load_config. connect=False
+    # (event loop callers) never connects inline: with no recent watcher
+    # result the call is admitted and the port watcher decides
+    def _check_service_port(self, port_check: dict, now: int, connect: bool = True):
+        service_prefix = port_check["service_prefix"]
+        port = port_check["port"]
+        recovery_timeout = port_check["recovery_timeout_ns"]
 
         # Track last down timestamp per service
-        if not hasattr(self, "_last_down"):
-            self._last_down = {}
         last_down_ts = self._last_down.get(service_prefix)
-        recovery_timeout = cfg.get("recovery_timeout", 30)
 
         if last_down_ts and now - last_down_ts < recovery_timeout:
             # Skip immediate retry, raise CircuitOpenError
             raise CircuitOpenError(
-                f"Service '{project}:{service}' port {port} DOWN (within recovery_timeout)"
+                f"Service '{self._key_name(service_prefix)}' port {port} DOWN (within recovery_timeout)"
             )
 
+        # Port was reachable recently; don't reconnect on every call
+        last_up_ts = self._last_up.get(service_prefix)
+        if last_up_ts and now - last_up_ts < recovery_timeout // 2:
+            return True
+
+        if not connect:
+            return True
+
         try:
-            host = cfg.get("docker_host") if self._is_docker() else cfg.get("local_host")
-            with socket.create_connection((host, port), timeout=1):
+            with socket.create_connection((port_check["host"], port), timeout=1):
                 # Service is UP, reset last_down timestamp
                 self._last_down.pop(service_prefix, None)
+                self._last_up[service_prefix] = now
                 return True
         except Exception:
-            # Mark circuits as OPEN
-            for circuit_key in list(self._circuits.keys()):
-                if circuit_key.startswith(service_prefix):
-                    self._set_state(circuit_key, State.OPEN, {
-                        "ts": now,
-                        "reason": f"port_{port}_down"
-                    })
-
-            # Create dummy if none exist
-            if not any(k.startswith(service_prefix) for k in self._circuits):
-                dummy_key = f"{project}:{service}:_dummy_api"
-                self._get_state(dummy_key)
-                self._set_state(dummy_key, State.OPEN, {"ts": now, "reason": f"port_{port}_down"})
-
-            # Record down timestamp for recovery_timeout logic
-            self._last_down[service_prefix] = now
-            raise CircuitOpenError(f"Service '{project}:{service}' port {port} is DOWN")
+            self._last_up.pop(service_prefix, None)
+            self._mark_service_down(service_prefix, port, recovery_timeout, now)
+            raise CircuitOpenError(f"Service '{self._key_name(service_prefix)}' port {port} is DOWN")
 
 
     # API-level state check
-    def _check_state(self, key: str, cfg: dict):
-        state = self._get_state(key)
-        now = time.time()
-
-        if state["state"] == State.OPEN and state["opened_at"]:
-            if now - state["opened_at"] >= cfg["recovery_timeout"]:
-                self._set_state(key, State.HALF_OPEN, {"ts": now})
-                state["half_open_inflight"] = 0
+    def _check_state(self, key: tuple, state: _CircuitState, cfg: dict, now: int):
+        if state.state == _OPEN:
+            if now >= state.blocked_until:
+                self._set_state(key, state, _HALF_OPEN, {}, now)
             else:
-                raise CircuitOpenError(f"Circuit '{key}' is OPEN. Retry later.")
+                raise CircuitOpenError(state.open_msg)
 
-        if state["state"] == State.HALF_OPEN:
-            if state["half_open_inflight"] >= cfg["half_open_max_calls"]:
-                raise CircuitOpenError(f"Circuit '{key}' is HALF_OPEN. Max probe reached.")
+        if state.state == _HALF_OPEN:
+            if state.half_open_inflight >= cfg["half_open_max_calls"]:
+                raise CircuitOpenError(f"Circuit '{self._key_name(key)}' is HALF_OPEN. Max probe reached.")
 
     # Record API failure
-    def _record_failure(self, key: str, cfg: dict):
-        state = self._get_state(key)
-        now = time.time()
-        state["fail_times"].append(now)
-        self._prune_failures(key, cfg)
+    def _record_failure(self, key: tuple, state: _CircuitState, cfg: dict, now: int):
+        if cfg["failure_threshold"] > BUCKETS_MIN_THRESHOLD:
+            self._prune_buckets(state, cfg, now)
+            buckets = state.buckets
+            buckets[state.bucket_head % len(buckets)] += 1
+            state.bucket_sum += 1
+            tripped = state.bucket_sum >= cfg["failure_threshold"]
+        else:
+            tripped = self._ring_failure(state, cfg, now)
 
-        if state["state"] == State.HALF_OPEN or len(state["fail_times"]) >= cfg["failure_threshold"]:
-            self._set_state(key, State.OPEN, {"ts": now, "reason": "api_failure_threshold"})
+        if state.state == _HALF_OPEN or tripped:
+            self._set_state(key, state, _OPEN, {"reason": "api_failure_threshold"}, now,
+                            cfg["recovery_timeout_ns"])
+
+    # Record a probe's success: close once success_threshold probes have
+    # succeeded since the circuit went HALF_OPEN; any failure in between reopens
+    # it and starts over. Calls admitted while CLOSED prove nothing about
+    # recovery, so only probes land here, and only while still HALF_OPEN
+    def _record_success(self, key: tuple, state: _CircuitState, cfg: dict, now: int):
+        if state.state == _HALF_OPEN:
+            state.half_open_successes += 1
+            if state.half_open_successes >= cfg["success_threshold"]:
+                self._set_state(key, state, _CLOSED, {}, now)
+
+    # Pre-call checks in one critical section. Returns True when the call
+    # holds a half-open probe slot that _exit must release.
+    # The wrapper skips this entirely on the CLOSED fast path.
+    def _enter(self, key: tuple, state: _CircuitState, cfg: dict, now: int,
+               connect: bool = True) -> bool:
+        # Port check before the lock: its fallback connect can block for up to
+        # 1 s and must not stall other callers of this circuit
+        if cfg["port_check"]:
+            self._check_service_port(cfg["port_check"], now, connect)
+
+        # Refusing a call changes nothing, so it needs no lock: while OPEN inside
+        # recovery_timeout, or HALF_OPEN with every probe slot taken
+        current = state.state
+        if current == _OPEN and now < state.blocked_until:
+            # Fresh exception per call (threads must not share one traceback),
+            # but the message is formatted once per circuit
+            raise CircuitOpenError(state.open_msg)
+        if current == _HALF_OPEN and state.half_open_inflight >= cfg["half_open_max_calls"]:
+            raise CircuitOpenError(f"Circuit '{self._key_name(key)}' is HALF_OPEN. Max probe reached.")
+
+        # The OPEN -> HALF_OPEN transition and taking a probe slot happen in the
+        # same critical section, so exactly half_open_max_calls callers win
+        try:
+            with state.lock:
+                self._check_state(key, state, cfg, now)
+                if state.state == _HALF_OPEN:
+                    state.half_open_inflight += 1
+                    return True
+            return False
+        finally:
+            self._flush_events()
+
+    # Post-call bookkeeping in one critical section. ok=None means the call
+    # was interrupted (BaseException): only the probe slot is released.
+    def _exit(self, key: tuple, state: _CircuitState, cfg: dict, ok: Optional[bool], probing: bool):
+        with state.lock:
+            if ok:
+                if probing:
+                    self._record_success(key, state, cfg, time.monotonic_ns())
+            elif ok is not None:
+                self._record_failure(key, state, cfg, time.monotonic_ns())
+            if probing and state.state == _HALF_OPEN and state.half_open_inflight > 0:
+                state.half_open_inflight -= 1
+        self._flush_events()
+
+    # Build the callable that actually runs func for a given response_timeout
+    def _make_invoker(self, func: Callable, timeout: Optional[float]) -> Callable:
+        if not timeout:
+            return func
+        submit = self._timeout_executor.submit
+
+        def invoke(*args, **kwargs):
+            # Runs on the shared pool rather than raising into this thread
+            # via PyThreadState_SetAsyncExc: async exceptions are only
+            # delivered between bytecodes, so they cannot interrupt a
+            # call blocked in socket I/O, which is what timeouts guard
+            future = submit(func, *args, **kwargs)
+            try:
+                return future.result(timeout=timeout)
+            except concurrent.futures.TimeoutError:
+                # Worker keeps running until func returns; it is not killed
+                future.cancel()
+                raise ResponseTimeoutError(f"Request timed out after {timeout} seconds.")
+        return invoke
+
+    # Async counterpart: the timeout is enforced on the event loop itself
+    @staticmethod
+    def _make_async_invoker(func: Callable, timeout: Optional[float]) -> Callable:
+        if not timeout:
+            return func
+
+        if hasattr(asyncio, "timeout"):
+            # 3.11+: the deadline is a timer on the current task, so the
+            # coroutine is awaited in place instead of wrapped in a new Task.
+            # A TimeoutError func raised itself is not ours to translate
+            async def invoke(*args, **kwargs):
+                cm = asyncio.timeout(timeout)
+                try:
+                    async with cm:
+                        return await func(*args, **kwargs)
+                except asyncio.TimeoutError:
+                    if cm.expired():
+                        raise ResponseTimeoutError(f"Request timed out after {timeout} seconds.")
+                    raise
+            return invoke
+
+        async def invoke(*args, **kwargs):
+            try:
+                return await asyncio.wait_for(func(*args, **kwargs), timeout=timeout)
+            except asyncio.TimeoutError:
+                raise ResponseTimeoutError(f"Request timed out after {timeout} seconds.")
+        return invoke
+
+    # Direct assignment of what callers and inspect actually look at, instead
+    # of functools.wraps copying every WRAPPER_ASSIGNMENTS entry and __dict__
+    @staticmethod
+    def _mirror(wrapper: Callable, func: Callable) -> Callable:
+        wrapper.__name__ = func.__name__
+        wrapper.__qualname__ = func.__qualname__
+        wrapper.__doc__ = func.__doc__
+        wrapper.__wrapped__ = func
+        return wrapper
 
-    # Record API success
-    def _record_success(self, key: str, cfg: dict):
-        state = self._get_state(key)
-        if state["state"] in [State.OPEN, State.HALF_OPEN]:
-            self._set_state(key, State.CLOSED, {"ts": time.time()})
-            
-    
     def __call__(self, project: str, service: str, api: str, fallback: Optional[Callable[..., Any]] = None):
+        # Interned once here, so the (project, service) config lookups the
+        # wrapper makes after a reload also match on identity
+        project, service, api = sys.intern(project), sys.intern(service), sys.intern(api)
+
         def decorator(func: Callable):
+            # Resolved once per decorated function, not per call
+            key = self._circuit_key(project, service, api)
+            state = self._get_state(key)   # circuit states live as long as the breaker
+            load_config = self._load_config
+            load_config(project, service)  # resolve now so the port watcher starts early
+            self._start_config_ticker()
+            make_invoker = self._make_invoker
+            enter = self._enter
+            exit_ = self._exit
+            epoch = self._cfg_epoch
+            monotonic_ns = time.monotonic_ns
+            CLOSED = _CLOSED
+
+            # (cfg, invoke, active, port_check, epoch) specialized for the current
+            # config and rebuilt when a reload bumps the epoch. The tuple is
+            # swapped in one assignment so threads never see a mix of two
+            # generations
+            spec = (None, func, True, None, -1)
+
             def wrapper(*args, **kwargs):
-                cfg = self._load_config(project, service)
+                nonlocal spec
+                if spec[4] != epoch[0]:
+                    current = epoch[0]   # read first: a reload racing us rebuilds again
+                    cfg = load_config(project, service)
+                    spec = (cfg, make_invoker(func, cfg["response_timeout"]),
+                            cfg["active"], cfg["port_check"], current)
+                cfg, invoke, active, port_check, _ = spec
 
                 # ⚙️ Skip circuit breaker if not active
-                if not cfg.get("active", True):
+                if not active:
                     return func(*args, **kwargs)
 
-                key = self._circuit_key(project, service, api)
-                lock = self._locks.setdefault(key, threading.RLock())
-
-                with lock:
-                    self._check_service_port(project, service, cfg)
-                    self._check_state(key, cfg)
-                    state = self._get_state(key)
-                    if state["state"] == State.HALF_OPEN:
-                        state["half_open_inflight"] += 1
+                # Single-slot reads are atomic under the GIL: a CLOSED circuit with
+                # no port check has nothing to transition, so no helper call or lock.
+                # No probe slot is held here, so only Exception needs handling and
+                # a success needs nothing at all
+                if state.state == CLOSED and port_check is None:
+                    try:
+                        result = invoke(*args, **kwargs)
+                    except Exception:
+                        exit_(key, state, cfg, False, False)
+                        if fallback:
+                            return fallback(*args, **kwargs)
+                        raise
+                    return result
 
+                probing = enter(key, state, cfg, monotonic_ns())
                 try:
-                    if cfg["response_timeout"]:
-                        with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
-                            future = executor.submit(func, *args, **kwargs)
-                            try:
-                                result = future.result(timeout=cfg["response_timeout"])
-                            except concurrent.futures.TimeoutError:
-                                with lock:
-                                    self._record_failure(key, cfg)
-                                raise ResponseTimeoutError(
-                                    f"Request timed out after {cfg['response_timeout']} seconds."
-                                )
-                    else:
-                        result = func(*args, **kwargs)
-
-                    with lock:
-                        self._record_success(key, cfg)
-                    return result
+                    result = invoke(*args, **kwargs)
 
-                except ResponseTimeoutError:
+                except Exception:
+                    exit_(key, state, cfg, False, probing)
                     if fallback:
                         return fallback(*args, **kwargs)
                     raise
 
+                except BaseException:
+                    if probing:
+                        exit_(key, state, cfg, None, probing)
+                    raise
+
+                if probing:
+                    exit_(key, state, cfg, True, probing)
+                return result
+            return self._mirror(wrapper, func)
+        return decorator
+
+    # Run func(*args) for every args tuple under a single admission check and
+    # one success record for the whole batch. The first failure is recorded
+    # and raised, ending the batch.
+    def call_batch(self, project: str, service: str, api: str, func: Callable,
+                   args_iter: Iterable[tuple]) -> list:
+        key = self._circuit_key(project, service, api)
+        state = self._get_state(key)
+        cfg = self._load_config(key[0], key[1])
+
+        if not cfg["active"]:
+            return [func(*args) for args in args_iter]
+
+        invoke = self._make_invoker(func, cfg["response_timeout"])
+        items = iter(args_iter)
+
+        if state.state == _CLOSED and cfg["port_check"] is None:
+            probing = False
+        else:
+            probing = self._enter(key, state, cfg, time.monotonic_ns())
+
+        results = []
+        append = results.append
+        while True:
+            # Items are pulled outside the guarded block: an error from the
+            # caller's own iterable says nothing about the downstream, so it
+            # only releases the probe slot
+            try:
+                args = next(items)
+            except StopIteration:
+                break
+            except BaseException:
+                if probing:
+                    self._exit(key, state, cfg, None, probing)
+                raise
+            try:
+                append(invoke(*args))
+            except Exception:
+                self._exit(key, state, cfg, False, probing)
+                raise
+            except BaseException:
+                if probing:
+                    self._exit(key, state, cfg, None, probing)
+                raise
+
+        if probing:
+            self._exit(key, state, cfg, True, probing)
+        return results
+
+    # Async decorator. Same _enter/_exit core as the sync one; neither holds
+    # the circuit lock across an await, so a thread lock is safe here too.
+    # The port check only reads the port watcher's results: a blocking
+    # connect would stall the whole event loop.
+    def async_wrap(self, project: str, service: str, api: str, fallback: Optional[Callable[..., Any]] = None):
+        project, service, api = sys.intern(project), sys.intern(service), sys.intern(api)
+
+        def decorator(func: Callable):
+            key = self._circuit_key(project, service, api)
+            state = self._get_state(key)
+            load_config = self._load_config
+            load_config(project, service)
+            self._start_config_ticker()
+            make_invoker = self._make_async_invoker
+            enter = self._enter
+            exit_ = self._exit
+            epoch = self._cfg_epoch
+            monotonic_ns = time.monotonic_ns
+            CLOSED = _CLOSED
+            fallback_is_async = fallback is not None and asyncio.iscoroutinefunction(fallback)
+
+            spec = (None, func, True, None, -1)
+
+            async def wrapper(*args, **kwargs):
+                nonlocal spec
+                if spec[4] != epoch[0]:
+                    current = epoch[0]   # read first: a reload racing us rebuilds again
+                    cfg = load_config(project, service)
+                    spec = (cfg, make_invoker(func, cfg["response_timeout"]),
+                            cfg["active"], cfg["port_check"], current)
+                cfg, invoke, active, port_check, _ = spec
+
+                if not active:
+                    return await func(*args, **kwargs)
+
+                if state.state == CLOSED and port_check is None:
+                    try:
+                        result = await invoke(*args, **kwargs)
+                    except Exception:
+                        exit_(key, state, cfg, False, False)
+                        if fallback:
+                            if fallback_is_async:
+                                return await fallback(*args, **kwargs)
+                            return fallback(*args, **kwargs)
+                        raise
+                    return result
+
+                probing = enter(key, state, cfg, monotonic_ns(), False)
+                try:
+                    result = await invoke(*args, **kwargs)
+
                 except Exception:
-                    with lock:
-                        self._record_failure(key, cfg)
+                    exit_(key, state, cfg, False, probing)
                     if fallback:
+                        if fallback_is_async:
+                            return await fallback(*args, **kwargs)
                         return fallback(*args, **kwargs)
                     raise
 
-                finally:
-                    with lock:
-                        state = self._get_state(key)
-                        if state["state"] == State.HALF_OPEN and state["half_open_inflight"] > 0:
-                            state["half_open_inflight"] -= 1
-            return wrapper
+                except BaseException:
+                    # includes asyncio.CancelledError
+                    if probing:
+                        exit_(key, state, cfg, None, probing)
+                    raise
+
+                if probing:
+                    exit_(key, state, cfg, True, probing)
+                return result
+            return self._mirror(wrapper, func)
         return decorator
 
 
@@ -305,4 +1170,4 @@ class CircuitBreaker:
     # Utility
     def status(self, project: str, service: str, api: str) -> str:
         key = self._circuit_key(project, service, api)
-        return self._get_state(key)["state"].value
+        return _STATES[self._get_state(key).state].value
@@ -1,3 +1,5 @@
+import atexit
+import sys
 import time
 import threading
 import asyncio
@@ -9,6 +11,12 @@ from enum import Enum
 from collections import deque
 from typing import Callable, Optional, Any, Dict
 
+# libyaml-backed loader when PyYAML was built with it
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeLoader
+
 
 # ----------------
 # Circuit breaker states
@@ -38,23 +46,39 @@ class CircuitBreaker:
         self.config_file = os.path.join(os.getenv("SERVICE_PATH", "."), config_file)
         self._cfg_cache = {}
         self._cfg_mtime = None
+        self._cfg_sections: Dict[tuple, dict] = {}   # (project, service) -> raw section
+        self._cfg_last_check = 0.0
+        self._cfg_ttl = 0.5   # seconds between config file stat checks
         self._log = logging.getLogger("CircuitBreaker")
+        # Shared pool for response_timeout calls; workers are reused across calls
+        self._timeout_executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=(os.cpu_count() or 1) * 4, thread_name_prefix="cb-timeout"
+        )
+        atexit.register(self._timeout_executor.shutdown, wait=False)
 
     # ----------------
     # Load config dynamically
     # ----------------
     def _load_config(self, project: str, service: str):
-        try:
-            mtime = os.path.getmtime(self.config_file)
-            if self._cfg_mtime != mtime:
-                with open(self.config_file, "r") as f:
-                    full_config = yaml.safe_load(f) or {}
-                self._cfg_cache = full_config
-                self._cfg_mtime = mtime
-        except FileNotFoundError:
-            self._cfg_cache = {}
-
-        cb_config = self._cfg_cache.get(project, {}).get(service, {})
+        now = time.monotonic()
+        if now - self._cfg_last_check >= self._cfg_ttl:
+            self._cfg_last_check = now
+            try:
+                mtime = os.path.getmtime(self.config_file)
+                if self._cfg_mtime != mtime:
+                    with open(self.config_file, "r") as f:
+                        full_config = yaml.load(f, Loader=SafeLoader) or {}
+                    self._cfg_cache = full_config
+                    self._cfg_sections = {}
+                    self._cfg_mtime = mtime
+            except FileNotFoundError:
+                self._cfg_cache = {}
+                self._cfg_sections = {}
+
+        cb_config = self._cfg_sections.get((project, service))
+        if cb_config is None:
+            cb_config = self._cfg_cache.get(project, {}).get(service, {})
+            self._cfg_sections[(project, service)] = cb_config
         return {
             "failure_threshold": cb_config.get("failure_threshold", 5),
             "recovery_timeout": cb_config.get("recovery_timeout", 30),
@@ -131,10 +155,11 @@ class CircuitBreaker:
     # ----------------
     def __call__(self, project: str, service: str, fallback: Optional[Callable[..., Any]] = None):
         def decorator(func: Callable):
+            key = sys.intern(f"{project}:{service}")   # identity hits in the per-key dicts
+            lock = self._locks.setdefault(key, threading.RLock())
+
             def wrapper(*args, **kwargs):
                 cfg = self._load_config(project, service)
-                key = f"{project}:{service}"
-                lock = self._locks.setdefault(key, threading.RLock())
                 with lock:
                     self._check_state(key, cfg)
                     state = self._get_state(key)
@@ -143,9 +168,12 @@ class CircuitBreaker:
 
                 try:
                     if cfg["response_timeout"]:
-                        with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
-                            future = executor.submit(func, *args, **kwargs)
+                        future = self._timeout_executor.submit(func, *args, **kwargs)
+                        try:
                             result = future.result(timeout=cfg["response_timeout"])
+                        except concurrent.futures.TimeoutError:
+                            future.cancel()
+                            raise
                     else:
                         result = func(*args, **kwargs)
 
@@ -171,10 +199,14 @@ class CircuitBreaker:
     # ----------------
     def async_wrap(self, project: str, service: str, fallback: Optional[Callable[..., Any]] = None):
         def decorator(func: Callable):
+            key = sys.intern(f"{project}:{service}")   # identity hits in the per-key dicts
+
             async def wrapper(*args, **kwargs):
                 cfg = self._load_config(project, service)
-                key = f"{project}:{service}"
-                alock = self._async_locks.setdefault(key, asyncio.Lock())
+                # Created lazily, on first use, so the lock binds to the running event loop
+                alock = self._async_locks.get(key)
+                if alock is None:
+                    alock = self._async_locks.setdefault(key, asyncio.Lock())
                 async with alock:
                     self._check_state(key, cfg)
                     state = self._get_state(key)
@@ -8,6 +8,10 @@ setup(
     install_requires=[
         'PyYAML',
     ],
+    extras_require={
+        'watchdog': ['watchdog'],
+        'redis': ['redis'],
+    },
     author='Achal Bante',
     url='https://github.com/qriprd89/CircuitBreakerLib'
 )
\ No newline at end of file
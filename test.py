@@ -38,6 +38,13 @@
 # import time
 # from CircuitBreakerLib.circuit_breaker_30_9_25 import CircuitBreaker, CircuitOpenError
 
+# # Faster event loop for the async timings when available (POSIX only)
+# try:
+#     import uvloop
+#     uvloop.install()
+# except ImportError:
+#     pass
+
 # # ---------------------------
 # # Initialize Circuit Breaker
 # # ---------------------------
@@ -169,4 +176,9 @@
 #         print("Second async call blocked:", e)
 
 # import asyncio
+# try:
+#     import uvloop
+#     uvloop.install()
+# except ImportError:
+#     pass
 # asyncio.run(main())